@@ -93,7 +93,11 @@ class GitTidyInputError(GitTidyError):
     """Error in the input arguments provided to Git methods."""
 
     def __init__(self, message: str):
-        super().__init__(message)
+        super().__init__(
+            title="Input Error",
+            intro=message,
+            details=None,
+        )
         return
 
 
@@ -101,5 +105,9 @@ class GitTidyOperationError(GitTidyError):
     """Error in the execution of an operation."""
 
     def __init__(self, message: str):
-        super().__init__(message)
+        super().__init__(
+            title="Operation Error",
+            intro=message,
+            details=None,
+        )
         return
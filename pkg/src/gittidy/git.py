@@ -2,10 +2,17 @@
 from __future__ import annotations as _annotations
 
 import datetime as _datetime
+import os as _os
 from typing import Literal as _Literal, TYPE_CHECKING as _TYPE_CHECKING
 from pathlib import Path as _Path
 import re as _re
+import shlex as _shlex
+import subprocess as _subprocess
+import tempfile as _tempfile
+import threading as _threading
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
 from contextlib import contextmanager as _contextmanager
+from functools import partial as _partial
 
 import loggerman as _loggerman
 import pyshellman as _pyshellman
@@ -13,10 +20,129 @@ import pyshellman as _pyshellman
 from gittidy import exception as _exception
 
 if _TYPE_CHECKING:
-    from typing import Literal
+    from typing import Iterator, Literal
     LogLevel = Literal["debug", "success", "info", "notice", "warning", "error", "critical"]
 
 
+# Whether to also log read-only probe commands, which are otherwise run silently
+_VERBOSE = _os.environ.get("GITTIDY_VERBOSE") == "1"
+
+# Subcommands that never change the state read by cached probes (see `Git._cached_run`);
+# any other command, including unknown ones, is assumed to change it.
+_READ_ONLY_SUBCOMMANDS = frozenset(
+    {
+        "blame", "cat-file", "check-attr", "check-ignore", "check-ref-format", "count-objects", "describe",
+        "diff", "diff-files", "diff-index", "diff-tree", "for-each-ref", "grep", "help", "log", "ls-files",
+        "ls-remote", "ls-tree", "merge-base", "name-rev", "rev-list", "rev-parse", "shortlog", "show",
+        "show-ref", "status", "var", "version",
+    }
+)
+# Options of 'git config' that only read the configuration
+_CONFIG_READ_OPTIONS = frozenset({"--list", "-l", "--get", "--get-all", "--get-regexp"})
+# Subcommands that never change which branch is checked out
+# ('rebase', and thus 'pull', detach HEAD while in progress)
+_BRANCH_PRESERVING_SUBCOMMANDS = frozenset(
+    {
+        "add", "am", "cherry-pick", "commit", "config", "fetch", "merge", "mv", "notes", "push", "remote",
+        "reset", "restore", "revert", "rm", "stash", "tag",
+    }
+)
+_CURRENT_BRANCH_PROBE = ("branch", "--show-current")
+# Subcommands that never write to the configuration (unlike e.g. 'push --set-upstream' or 'submodule')
+_CONFIG_PRESERVING_SUBCOMMANDS = frozenset(
+    {
+        "add", "am", "cherry-pick", "commit", "merge", "mv", "notes", "reset", "restore", "revert", "rm",
+        "stash", "symbolic-ref", "tag", "update-ref",
+    }
+)
+
+# Entries of `Git._status` with an unstaged (Y) status other than ' ';
+# entries start at the beginning of the output or after a NUL, which cannot occur in paths.
+_UNSTAGED_CHANGE_RE = _re.compile(rb"(?:^|\0).[^ ]", _re.DOTALL)
+
+# Maximum number of paths `Git.commit` passes to `git add`; beyond that, the whole tree is staged.
+_MAX_STAGE_PATHSPECS = 100
+
+# Owner and name of a GitHub repository, from an HTTPS or SSH remote URL
+_GITHUB_URL_RE = _re.compile(r"github\.com[/:]([\w\-]+)/([\w\-.]+?)(?:\.git)?$")
+
+
+# Global options (i.e. before the subcommand) whose value is given as a separate argument
+_GLOBAL_OPTIONS_WITH_VALUE = frozenset(
+    {"-c", "-C", "--git-dir", "--namespace", "--super-prefix", "--work-tree"}
+)
+
+
+def _strip_global_options(command: list[str]) -> list[str]:
+    """Arguments of a Git command starting from its subcommand, e.g. `['-C', 'dir', 'status']` -> `['status']`."""
+    idx = 0
+    while idx < len(command) and command[idx].startswith("-"):
+        idx += 2 if command[idx] in _GLOBAL_OPTIONS_WITH_VALUE else 1
+    return command[idx:]
+
+
+def _mutates(command: list[str]) -> bool:
+    """Whether a Git command, given from its subcommand on, may change the state read by cached probes."""
+    subcommand = command[0] if command else ""
+    if subcommand == "branch":
+        return "--show-current" not in command
+    if subcommand == "config":
+        return _CONFIG_READ_OPTIONS.isdisjoint(command)
+    if subcommand == "remote":
+        return command not in (["remote"], ["remote", "-v"])
+    return subcommand not in _READ_ONLY_SUBCOMMANDS
+
+
+def _config_list_command(scope: _Literal["system", "global", "local", "worktree"] | None) -> list[str]:
+    """Git command listing all configuration entries of a scope, as parsed by `_parse_config_list`."""
+    cmd = ["config"]
+    if scope:
+        cmd.append(f"--{scope}")
+    return [*cmd, "--list", "-z"]
+
+
+def _parse_config_list(output: _pyshellman.ShellOutput) -> dict[str, str]:
+    """Configuration entries from the output of a `_config_list_command`, which is empty on failure."""
+    config = {}
+    if output.code == 0:
+        # Each entry is '<key>\n<value>\0', or '<key>\0' for keys without a value.
+        # Values are raw bytes (e.g. paths) that need not be valid UTF-8.
+        for entry in (output.out or b"").split(b"\0"):
+            if entry:
+                key, _, value = entry.decode(errors="surrogateescape").partition("\n")
+                config[key] = value
+    return config
+
+
+def _user_config_entries(
+    username: str | None,
+    email: str | None,
+    user_type: _Literal["user", "author", "committer"],
+    scope: _Literal["system", "global", "local", "worktree"] | None,
+) -> list[tuple[str | None, str, str | None]]:
+    """Configuration entries for `Git._set_config` setting a user's name and email.
+
+    Empty values are skipped, and None values result in unsetting the entry.
+    """
+    return [
+        (scope, f"{user_type}.{key}", value)
+        for key, value in (("name", username), ("email", email)) if value is None or value
+    ]
+
+
+@_contextmanager
+def _gittidy_errors():
+    """Re-raise errors of PyShellMan as the corresponding GitTidy errors."""
+    try:
+        yield
+    except _pyshellman.exception.PyShellManExecutionError as e:
+        raise _exception.GitTidyGitNotFoundError(e) from None
+    except _pyshellman.exception.PyShellManNonZeroExitCodeError as e:
+        raise _exception.GitTidyNonZeroGitExitCodeError(e) from None
+    except _pyshellman.exception.PyShellManStderrError as e:
+        raise _exception.GitTidyGitStderrError(e) from None
+
+
 class Git:
 
     def __init__(
@@ -40,34 +166,44 @@ class Git:
         log_level_stderr: LogLevel = "info",
         log_level_success: LogLevel = "success",
     ):
+        self._cat_file_processes: dict[str, _subprocess.Popen] = {}
+        self._cat_file_lock = _threading.Lock()
+        # Outputs of idempotent read-only commands; disabled by setting `GITTIDY_PROBE_CACHE=0`.
+        self._probe_cache: dict[tuple[str, ...], _pyshellman.ShellOutput] = {}
+        self._probe_cache_enabled = _os.environ.get("GITTIDY_PROBE_CACHE") != "0"
+        # Configuration entries per scope, as parsed by `_config_snapshot` and updated by `_set_config`
+        self._config_cache: dict[str | None, dict[str, str]] = {}
+        # Commands may run concurrently (see `fetch_remote_branches_by_name`);
+        # the generation is incremented on each invalidation, so that probes
+        # that were running meanwhile do not store their possibly outdated outputs.
+        self._probe_cache_lock = _threading.Lock()
+        self._probe_cache_generation = 0
         if logger:
             self.logger = logger
         else:
             self.logger = _loggerman.create(realtime_levels=None)
             self.logger.section("GitTidy Logs")
-        self._shell_runner = _pyshellman.Runner(
+        runner_config = dict(
             pre_command=["git"],
             raise_execution=raise_execution,
             raise_exit_code=raise_exit_code,
             raise_stderr=raise_stderr,
-            logger=self.logger,
             log_title=log_title,
             log_level_execution=log_level_execution,
             log_level_exit_code=log_level_exit_code,
             log_level_stderr=log_level_stderr,
             log_level_success=log_level_success,
         )
+        self._shell_runner = _pyshellman.Runner(logger=self.logger, **runner_config)
+        # Runner for commands run with `log=False`
+        self._quiet_runner = _pyshellman.Runner(logger=self.logger if _VERBOSE else None, **runner_config)
         self._path = None
-        self.run_command(
-            ["version", "--build-options"],
-            log_title="Git: Check Version",
-            raise_execution=True,
-            raise_exit_code=False,
-            raise_stderr=False,
-        )
+        # A missing Git executable raises `GitTidyGitNotFoundError` here,
+        # so no separate `git version` check is needed.
         output_repo_path = self.run_command(
             ["-C", str(_Path(path).resolve()), "rev-parse", "--show-toplevel"],
             log_title="Git: Check Repository Path",
+            raise_execution=True,
             raise_exit_code=False,
             raise_stderr=False,
         )
@@ -111,10 +247,30 @@ class Git:
             self._committer_persistent = True
         return
 
+    def __del__(self):
+        if getattr(self, "_cat_file_processes", None):
+            self.close()
+        return
+
     @property
     def repo_path(self) -> _Path:
         return self._path
 
+    @property
+    def version(self) -> str:
+        """Version of the Git executable, as reported by `git version`."""
+        return self.run_command(["version"], log_title="Git: Check Version", stack_up=1).out
+
+    def close(self) -> None:
+        """Terminate the persistent `git cat-file` processes owned by this instance."""
+        with self._cat_file_lock:
+            for process in self._cat_file_processes.values():
+                if process.poll() is None:
+                    process.stdin.close()
+                    process.wait()
+            self._cat_file_processes.clear()
+        return
+
     def run_command(
         self,
         command: list[str],
@@ -128,12 +284,14 @@ class Git:
         log_level_stderr: LogLevel | None = None,
         log_level_success: LogLevel | None = None,
         text_output: bool = True,
+        log: bool = True,
         stack_up: int = 0,
     ) -> _pyshellman.ShellOutput:
+        runner = self._shell_runner if log else self._quiet_runner
 
         def run() -> _pyshellman.ShellOutput:
-            try:
-                return self._shell_runner.run(
+            with _gittidy_errors():
+                return runner.run(
                     command=command,
                     cwd=self._path,
                     raise_execution=raise_execution,
@@ -147,20 +305,144 @@ class Git:
                     log_level_success=log_level_success,
                     stack_up=stack_up + 2,
                 )
-            except _pyshellman.exception.PyShellManExecutionError as e:
-                raise _exception.GitTidyGitNotFoundError(e) from None
-            except _pyshellman.exception.PyShellManNonZeroExitCodeError as e:
-                raise _exception.GitTidyNonZeroGitExitCodeError(e) from None
-            except _pyshellman.exception.PyShellManStderrError as e:
-                raise _exception.GitTidyGitStderrError(e) from None
-
-        if needs_credentials:
-            with self._temporary_credentials():
+
+        try:
+            if needs_credentials:
+                with self._temporary_credentials():
+                    result = run()
+            else:
                 result = run()
-        else:
-            result = run()
+        finally:
+            self._invalidate_probes(command)
+        return result
+
+    def _run_script(
+        self,
+        commands: list[list[str]],
+        needs_credentials: bool = False,
+        log_title: str | None = None,
+        stack_up: int = 0,
+    ) -> _pyshellman.ShellOutput:
+        """Run several commands in a single POSIX shell process, stopping at the first failure.
+
+        Each command is a list of arguments, and is run as is; Git commands must thus include 'git'.
+        """
+        runner = self._shell_runner
+
+        def run() -> _pyshellman.ShellOutput:
+            with _gittidy_errors():
+                return _pyshellman.run(
+                    command=["sh", "-c", " && ".join(_shlex.join(command) for command in commands)],
+                    cwd=self._path,
+                    raise_execution=runner.raise_execution,
+                    raise_exit_code=runner.raise_exit_code,
+                    raise_stderr=runner.raise_stderr,
+                    logger=self.logger,
+                    log_title=log_title or runner.log_title,
+                    log_level_execution=runner.log_level_execution,
+                    log_level_exit_code=runner.log_level_exit_code,
+                    log_level_stderr=runner.log_level_stderr,
+                    log_level_success=runner.log_level_success,
+                    stack_up=stack_up + 2,
+                )
+
+        try:
+            if needs_credentials:
+                with self._temporary_credentials():
+                    result = run()
+            else:
+                result = run()
+        finally:
+            for command in commands:
+                if command[0] == "git":
+                    self._invalidate_probes(command[1:])
+        return result
+
+    def _invalidate_probes(self, command: list[str]) -> None:
+        """Clear cached probe outputs that may have been changed by a Git command.
+
+        The current branch name is kept for commands that cannot switch branches,
+        and configuration snapshots for commands that cannot change the configuration,
+        so that e.g. consecutive commits and pushes do not repeatedly query them.
+        """
+        command = _strip_global_options(command)
+        if not _mutates(command):
+            return
+        subcommand = command[0] if command else ""
+        with self._probe_cache_lock:
+            self._probe_cache_generation += 1
+            current_branch = self._probe_cache.get(_CURRENT_BRANCH_PROBE)
+            self._probe_cache.clear()
+            if subcommand in _BRANCH_PRESERVING_SUBCOMMANDS and current_branch is not None:
+                self._probe_cache[_CURRENT_BRANCH_PROBE] = current_branch
+            if subcommand not in _CONFIG_PRESERVING_SUBCOMMANDS:
+                self._config_cache.clear()
+        return
+
+    def _cached_run(self, command: list[str], **kwargs) -> _pyshellman.ShellOutput:
+        """Run a read-only Git command without logging, reusing its output from a previous call.
+
+        This must only be used for commands whose output solely depends on repository state;
+        the cache is cleared whenever a command not in `_READ_ONLY_SUBCOMMANDS`
+        is run via `run_command` (see `_invalidate_probes`).
+        """
+        if not self._probe_cache_enabled:
+            return self.run_command(command, log=False, **kwargs)
+        key = tuple(command)
+        with self._probe_cache_lock:
+            result = self._probe_cache.get(key)
+            generation = self._probe_cache_generation
+        if result is None:
+            result = self.run_command(command, log=False, **kwargs)
+            self._store_probes(generation, outputs={key: result})
         return result
 
+    def _store_probes(
+        self,
+        generation: int,
+        outputs: dict[tuple[str, ...], _pyshellman.ShellOutput] | None = None,
+        config_snapshots: dict[str | None, dict[str, str]] | None = None,
+    ) -> None:
+        """Cache probe outputs and configuration snapshots,
+        unless the cache was invalidated since the given generation.
+        """
+        with self._probe_cache_lock:
+            if generation == self._probe_cache_generation:
+                self._probe_cache.update(outputs or {})
+                self._config_cache.update(config_snapshots or {})
+        return
+
+    def _check_output(
+        self,
+        output: _pyshellman.ShellOutput,
+        raise_execution: bool | None = None,
+        raise_exit_code: bool | None = None,
+        log: bool = True,
+        stack_up: int = 0,
+    ) -> _pyshellman.ShellOutput:
+        """Log and check the output of a Git command that was not run via `run_command`,
+        in the same way as the runner of `run_command` does.
+        """
+        runner = self._shell_runner if log else self._quiet_runner
+        if runner.logger:
+            if not output.executed:
+                log_level = runner.log_level_execution
+            elif not output.succeeded:
+                log_level = runner.log_level_exit_code
+            elif output.err:
+                log_level = runner.log_level_stderr
+            else:
+                log_level = runner.log_level_success
+            runner.logger.log(log_level, output.title, output.report(dropdown=False), stack_up=stack_up + 1)
+        with _gittidy_errors():
+            if not output.executed and (runner.raise_execution if raise_execution is None else raise_execution):
+                raise _pyshellman.exception.PyShellManExecutionError(output=output)
+            if not output.succeeded and (runner.raise_exit_code if raise_exit_code is None else raise_exit_code):
+                raise _pyshellman.exception.PyShellManNonZeroExitCodeError(output=output)
+            if output.err and runner.raise_stderr:
+                raise _pyshellman.exception.PyShellManStderrError(output=output)
+        return output
+
 
     def push(
         self,
@@ -207,13 +489,42 @@ class Git:
         """
         if not amend and not message:
             raise _exception.GitTidyInputError("No 'message' provided for new commit.")
-        if stage != "none":
+        # Whether the index differs from HEAD in a way that staging `to_stage` cannot undo
+        has_staged = False
+        to_stage = []
+        if stage != "none" or not allow_empty:
+            # Dirty submodule content cannot be staged, so it does not count as a change.
+            status = self._status(
+                untracked=stage == "all",
+                ignore_dirty_submodules=True,
+                log_title="Git: Check Changes",
+            )
+            for entry in status.split(b"\0"):
+                if not entry:
+                    continue
+                staged, unstaged, path = entry[0:1], entry[1:2], entry[3:]
+                if unstaged != b" " and (stage == "all" or (stage == "tracked" and unstaged != b"?")):
+                    to_stage.append(path)
+                    # Staging a path whose index entry already differs from HEAD
+                    # may turn it back into HEAD, e.g. for 'MM' with a reverted working tree, or 'AD'.
+                    has_staged |= staged in (b" ", b"?")
+                else:
+                    has_staged |= staged not in (b" ", b"?")
+        if not (allow_empty or has_staged or to_stage):
+            return
+        if to_stage:
+            add_cmd = ["add", "-A" if stage == "all" else "-u"]
+            if len(to_stage) <= _MAX_STAGE_PATHSPECS:
+                # Paths are raw bytes, which `os.fsdecode` turns into strings that round-trip to argv.
+                add_cmd.extend(["--", *(f":(literal){_os.fsdecode(path)}" for path in to_stage)])
             self.run_command(
-                ["add", "-A" if stage == "all" else "-u"],
+                add_cmd,
                 needs_credentials=True,
                 log_title="Git: Stage Changes",
                 stack_up=1,
             )
+            if not (allow_empty or has_staged or self.has_changes(check_type="staged")):
+                return
         commit_cmd = ["commit"]
         if amend:
             commit_cmd.append("--amend")
@@ -224,16 +535,13 @@ class Git:
         for msg_line in message.splitlines():
             if msg_line:
                 commit_cmd.extend(["-m", msg_line])
-        commit_hash = None
-        if allow_empty or self.has_changes(check_type="staged"):
-            self.run_command(
-                commit_cmd,
-                needs_credentials=True,
-                log_title="Git: Commit Changes",
-                stack_up=1,
-            )
-            commit_hash = self.commit_hash_normal()
-        return commit_hash
+        self.run_command(
+            commit_cmd,
+            needs_credentials=True,
+            log_title="Git: Commit Changes",
+            stack_up=1,
+        )
+        return self.commit_hash_normal()
 
     def create_tag(
         self,
@@ -246,6 +554,22 @@ class Git:
             cmd.append(tag)
         else:
             cmd.extend(["-a", tag, "-m", message])
+        if push_target and _os.name == "posix":
+            # Create, show, and push the tag in one process;
+            # the marker separates the output of `git show` from that of `git push`.
+            marker = "<<<GitTidy: end of git show>>>"
+            result = self._run_script(
+                [
+                    ["git", *cmd],
+                    ["git", "show", tag],
+                    ["echo", marker],
+                    ["git", "push", push_target, tag],
+                ],
+                needs_credentials=True,
+                log_title="Git: Create and Push Tag",
+                stack_up=1,
+            )
+            return (result.out or "").rpartition(marker)[0].strip() or None
         self.run_command(cmd, needs_credentials=True, log_title="Git: Create Tag", stack_up=1)
         out = self.run_command(["show", tag], log_title="Git: Show Tag", stack_up=1).out
         if push_target:
@@ -287,26 +611,24 @@ class Git:
         Returns:
         - bool: True if changes are detected, False otherwise.
         """
-        commands = {"staged": ["diff", "--quiet", "--cached"], "unstaged": ["diff", "--quiet"]}
-        if path:
-            commands = {k: [*v, path] for k, v in commands.items()}
-        if check_type == "all":
-            return any(
-                self.run_command(
-                    cmd,
-                    raise_exit_code=False,
-                    log_title=f"Git: Check {cmd_type} changes",
-                    log_level_exit_code=self._shell_runner.log_level_success,
-                    stack_up=1,
-                ).code != 0 for cmd_type, cmd in commands.items()
-            )
-        return self.run_command(
-            commands[check_type],
-            raise_exit_code=False,
-            log_level_exit_code=self._shell_runner.log_level_success,
-            log_title=f"Git: Check {check_type} changes",
-            stack_up=1,
-        ).code != 0
+        if check_type == "staged":
+            # Only the index is compared to HEAD, without scanning the working tree.
+            cmd = ["diff", "--quiet", "--cached"]
+            if path:
+                cmd.extend(["--", str(path)])
+            return self.run_command(
+                cmd,
+                raise_exit_code=False,
+                log_title="Git: Check staged changes",
+                log_level_exit_code=self._shell_runner.log_level_success,
+                log=False,
+                stack_up=1,
+            ).code != 0
+        status = self._status(path=path, log_title=f"Git: Check {check_type} changes")
+        if check_type == "unstaged":
+            return _UNSTAGED_CHANGE_RE.search(status) is not None
+        # Untracked files are excluded, so every entry is a change.
+        return bool(status)
 
     def restore(
         self,
@@ -375,34 +697,44 @@ class Git:
 
         """
         key_def = {
-            "A": "added",
-            "D": "deleted",
-            "M": "modified",
-            "U": "unmerged",
-            "X": "unknown",
-            "B": "broken",
-            "C": "copied",
-            "R": "renamed",
+            b"A": "added",
+            b"D": "deleted",
+            b"M": "modified",
+            b"U": "unmerged",
+            b"X": "unknown",
+            b"B": "broken",
+            b"C": "copied",
+            b"R": "renamed",
         }
         out = {}
-        changes = self.run_command(
-            ["diff", "--name-status", ref_start, ref_end],
-            log_title="Git: Get Changed Files",
-            stack_up=1,
-        ).out.splitlines()
-        for change in changes:
-            key, *paths = change.split("\t")
-            if key in key_def:
-                out.setdefault(key_def[key], []).extend(paths)
+        # With '-z', each change is printed as '<status>\0<path>\0',
+        # or '<status>\0<source path>\0<destination path>\0' for copies and renames.
+        # Paths are unquoted raw bytes, and are decoded like file system paths
+        # so that names that are not valid UTF-8 do not fail.
+        fields = (
+            self.run_command(
+                ["diff", "--name-status", "-z", ref_start, ref_end],
+                log_title="Git: Get Changed Files",
+                text_output=False,
+                stack_up=1,
+            ).out or b""
+        ).split(b"\0")
+        idx = 0
+        while idx + 1 < len(fields):
+            status = fields[idx]
+            out_key = key_def.get(status)
+            if out_key:
+                out.setdefault(out_key, []).append(_os.fsdecode(fields[idx + 1]))
+                idx += 2
                 continue
-            key, similarity = key[0], int(key[1:])
-            if key not in ["C", "R"]:
-                raise ValueError(f"Unknown file change type: {change}")
-            out_key = key_def[key]
-            if similarity != 100:
+            if status[:1] not in (b"C", b"R"):
+                raise ValueError(f"Unknown file change type: {status.decode()}")
+            out_key = key_def[status[:1]]
+            if status[1:] != b"100":
                 out_key += "_modified"
-            out.setdefault(f"{out_key}_from", []).append(paths[0])
-            out.setdefault(f"{out_key}_to", []).append(paths[1])
+            out.setdefault(f"{out_key}_from", []).append(_os.fsdecode(fields[idx + 1]))
+            out.setdefault(f"{out_key}_to", []).append(_os.fsdecode(fields[idx + 2]))
+            idx += 3
         return out
 
     def commit_hash_normal(self, parent: int = 0) -> str | None:
@@ -415,11 +747,16 @@ class Git:
         Returns:
         - str: The commit hash.
         """
-        return self.run_command(
+        obj = self._cat_file(f"HEAD~{parent}", content=False)
+        if obj:
+            return obj[0]
+        # Let Git report why the commit cannot be resolved.
+        result = self.run_command(
             ["rev-parse", f"HEAD~{parent}"],
             log_title="Git: Get Commit Hash",
             stack_up=1,
-        ).out
+        )
+        return result.out if result.succeeded else None
 
     def commit_date_latest(self) -> _datetime.datetime:
         # Run the git command to get the commit date
@@ -440,7 +777,7 @@ class Git:
             cmd.append("--first-parent")
         if match:
             cmd.extend(["--match", match])
-        result = self.run_command(command=cmd, raise_exit_code=False, log_title="Git: Describe", stack_up=1)
+        result = self._cached_run(cmd, raise_exit_code=False, log_title="Git: Describe", stack_up=2)
         return result.out if result.code == 0 else None
 
     def log(
@@ -480,24 +817,69 @@ class Git:
         """
         Set the git username and email.
         """
-        cmd = ["config"]
-        if scope:
-            cmd.append(f"--{scope}")
         if not ((username is None or isinstance(username, str)) and (email is None or isinstance(email, str))):
             raise _exception.GitTidyInputError("'username' and 'email' must be either a string or None.")
-        for key, val in [("name", username), ("email", email)]:
-            if val is None:
-                self.run_command(
-                    [*cmd, "--unset", f"{user_type}.{key}"],
-                    log_title=f"Git: Unset {user_type} {key}",
-                    stack_up=1,
-                )
-            elif val:
-                self.run_command(
-                    [*cmd, f"{user_type}.{key}", val],
-                    log_title=f"Git: Set {user_type} {key}",
-                    stack_up=1,
-                )
+        self._set_config(
+            _user_config_entries(username=username, email=email, user_type=user_type, scope=scope),
+            log_title=f"Git: Set {user_type}",
+        )
+        return
+
+    def _set_config(
+        self,
+        entries: list[tuple[str | None, str, str | None]],
+        log_title: str = "Git: Set Config",
+        skip_unchanged: bool = True,
+    ) -> None:
+        """Set several configuration entries, using a single process where possible.
+
+        Parameters
+        ----------
+        entries : list of tuple
+            Scope, key, and value of each entry. Entries with a value of None are unset.
+        skip_unchanged : bool, default: True
+            Skip entries that already have the given value (or are already unset),
+            according to the cached configuration snapshot of their scope.
+        """
+        if skip_unchanged:
+            # Entries without a scope are written to the local configuration.
+            entries = [
+                (scope, key, value) for scope, key, value in entries
+                if self._config_snapshot(scope=scope or "local").get(key) != value
+            ]
+        if not entries:
+            return
+        # Cached snapshots of the written scopes are updated in place after the write,
+        # instead of being queried again, since the write clears them (see `_invalidate_probes`).
+        with self._probe_cache_lock:
+            snapshots = {
+                scope: dict(self._config_cache[scope])
+                for scope in {scope or "local" for scope, _, _ in entries} if scope in self._config_cache
+            }
+        commands = []
+        for scope, key, value in entries:
+            cmd = ["config"]
+            if scope:
+                cmd.append(f"--{scope}")
+            commands.append([*cmd, "--unset", key] if value is None else [*cmd, key, value])
+        if len(commands) > 1 and _os.name == "posix":
+            results = [
+                self._run_script([["git", *command] for command in commands], log_title=log_title, stack_up=2)
+            ]
+        else:
+            results = [self.run_command(command, log_title=log_title, stack_up=2) for command in commands]
+        if not (snapshots and all(result.succeeded for result in results)):
+            return
+        for scope, key, value in entries:
+            snapshot = snapshots.get(scope or "local")
+            if snapshot is None:
+                continue
+            if value is None:
+                snapshot.pop(key, None)
+            else:
+                snapshot[key] = value
+        with self._probe_cache_lock:
+            self._config_cache.update(snapshots)
         return
 
     def get_user(
@@ -508,25 +890,37 @@ class Git:
         """
         Get the git username and email.
         """
-        cmd = ["config"]
-        if scope:
-            cmd.append(f"--{scope}")
-        user = []
-        for key in ["name", "email"]:
-            result = self.run_command(
-                [*cmd, f"{user_type}.{key}"],
-                raise_exit_code=False,
-                log_title=f"Git: Get {user_type} {key}",
-                stack_up=1,
+        config = self._config_snapshot(scope=scope)
+        return config.get(f"{user_type}.name") or None, config.get(f"{user_type}.email") or None
+
+    def _config_snapshot(
+        self,
+        scope: _Literal["system", "global", "local", "worktree"] | None = None,
+    ) -> dict[str, str]:
+        """Get all configuration entries of a scope from a single `git config --list` call.
+
+        The result is cached until the configuration is modified by a command,
+        and is kept up to date by writes via `_set_config`, e.g. in `set_user`.
+        A scope whose configuration file does not exist yields an empty dictionary.
+        """
+        with self._probe_cache_lock:
+            config = self._config_cache.get(scope)
+            generation = self._probe_cache_generation
+        if config is None:
+            config = _parse_config_list(
+                self.run_command(
+                    _config_list_command(scope),
+                    raise_exit_code=False,
+                    log_title=f"Git: List {scope or 'all'} config",
+                    log_level_exit_code=self._shell_runner.log_level_success,
+                    text_output=False,
+                    log=False,
+                    stack_up=1,
+                )
             )
-            if result.code == 0:
-                user.append(result.out)
-            elif result.code == 1 and not result.out:
-                user.append(None)
-            else:
-                raise _exception.GitTidyOperationError(
-                    f"Failed to get {user_type}.{key}")
-        return tuple(user)
+            if self._probe_cache_enabled:
+                self._store_probes(generation, config_snapshots={scope: config})
+        return config
 
     def fetch_remote_branches_by_pattern(
         self,
@@ -534,24 +928,28 @@ class Git:
         remote_name: str = "origin",
         exists_ok: bool = False,
         not_fast_forward_ok: bool = False,
+        max_workers: int = 1,
     ) -> None:
-        remote_branches = self.run_command(
-            ["branch", "-r"],
+        remote_refs = self.run_command(
+            ["for-each-ref", "--format=%(refname)", f"refs/remotes/{remote_name}"],
             log_title="Git: List Remote Branches",
             stack_up=1,
-        ).out.splitlines()
-        branch_names = []
-        for remote_branch in remote_branches:
-            remote_branch = remote_branch.strip()
-            if remote_branch.startswith(f"{remote_name}/") and " -> " not in remote_branch:
-                remote_branch = remote_branch.removeprefix(f"{remote_name}/")
-                if not branch_pattern or branch_pattern.match(remote_branch):
-                    branch_names.append(remote_branch)
+        ).out or ""
+        # Remote names can contain slashes, so the prefix is removed instead of a fixed number of components.
+        prefix = f"refs/remotes/{remote_name}/"
+        branch_names = [
+            remote_branch for remote_branch in (
+                remote_ref.removeprefix(prefix) for remote_ref in remote_refs.splitlines()
+            )
+            # 'HEAD' is the symbolic ref to the remote's default branch
+            if remote_branch != "HEAD" and (not branch_pattern or branch_pattern.match(remote_branch))
+        ]
         self.fetch_remote_branches_by_name(
             branch_names=branch_names,
             remote_name=remote_name,
             exists_ok=exists_ok,
             not_fast_forward_ok=not_fast_forward_ok,
+            max_workers=max_workers,
         )
         return
 
@@ -561,21 +959,49 @@ class Git:
         remote_name: str = "origin",
         exists_ok: bool = False,
         not_fast_forward_ok: bool = False,
+        max_workers: int = 1,
     ) -> None:
+        """Fetch remote branches into local branches of the same name.
+
+        Parameters
+        ----------
+        max_workers : int, default: 1
+            Maximum number of concurrent `git fetch` processes the refspecs are distributed over.
+            With more than one process, FETCH_HEAD is not written,
+            since the processes would otherwise race on writing it.
+        """
         if isinstance(branch_names, str):
             branch_names = [branch_names]
         if not exists_ok:
             curr_branch, other_branches = self.get_all_branch_names()
-            local_branches = [curr_branch] + other_branches
+            local_branches = {curr_branch, *other_branches}
             branch_names = [branch_name for branch_name in branch_names if branch_name not in local_branches]
         refspecs = [
             f"{'+' if not_fast_forward_ok else ''}{branch_name}:{branch_name}" for branch_name in branch_names
         ]
-        self.run_command(
-            ["fetch", remote_name, *refspecs],
-            log_title="Git: Fetch Remote Branches",
-            stack_up=1,
-        )
+        num_shards = min(len(refspecs), max_workers)
+        if num_shards <= 1:
+            self.run_command(
+                ["fetch", remote_name, *refspecs],
+                log_title="Git: Fetch Remote Branches",
+                stack_up=1,
+            )
+            return
+        # Concurrent fetches would race on writing FETCH_HEAD, so it is skipped.
+        # The threads share this instance's probe cache (guarded by its lock) and logger,
+        # so the log records of the shards may appear in any order.
+        shards = [refspecs[idx::num_shards] for idx in range(num_shards)]
+        with _ThreadPoolExecutor(max_workers=num_shards) as executor:
+            list(
+                executor.map(
+                    lambda shard: self.run_command(
+                        ["fetch", "--no-write-fetch-head", remote_name, *shard],
+                        log_title="Git: Fetch Remote Branches",
+                        stack_up=1,
+                    ),
+                    shards,
+                )
+            )
         # for branch_name in branch_names:
         #     self._run(["git", "branch", "--track", branch_name, f"{remote_name}/{branch_name}"])
         # self._run(["git", "fetch", "--all"])
@@ -597,47 +1023,80 @@ class Git:
         - revision_range (str): The revision range to get commits from.
 
         Returns:
-        - list[str]: A list of commit hashes.
+        - list[dict]: A list of commits, as yielded by `iter_commits`.
+        """
+        return list(self.iter_commits(revision_range=revision_range))
+
+    def iter_commits(self, revision_range: str | None = None) -> Iterator[dict[str, str | list[str]]]:
         """
-        marker_start = "<start new commit>"
-        hash = "%H"
-        author = "%an"
-        date = "%ad"
-        commit = "%B"
-        marker_commit_end = "<end of commit message>"
+        Iterate over commits, parsing the output of `git log` while it is being streamed.
+
+        Parameters:
+        - revision_range (str): The revision range to get commits from.
 
-        format = f"{marker_start}%n{hash}%n{author}%n{date}%n{commit}%n{marker_commit_end}"
-        cmd = ["log", f"--pretty=format:{format}", "--name-only"]
+        Yields:
+        - dict: The 'hash', 'author', 'date', 'msg', and 'files' (list of changed paths) of a commit.
+        """
 
+        def make_commit(fields: list[bytes]) -> dict[str, str | list[str]]:
+            hash, author, date, msg = (field.decode() for field in fields[:4])
+            # Paths are unquoted raw bytes, which need not be valid UTF-8.
+            files = [_os.fsdecode(field) for field in fields[4:]]
+            if files:
+                files[0] = files[0].removeprefix("\n")
+            return {"hash": hash, "author": author, "date": date, "msg": msg.strip(), "files": files}
+
+        # With '-z', each commit is printed as
+        # '\0<hash>\0<author>\0<date>\0<message>\0', followed by
+        # '\n<file>\0<file>\0...' if it has changed files.
+        # Since paths are never empty, an empty field after the message always marks the end of a commit.
+        cmd = ["git", "log", "--pretty=tformat:%x00%H%x00%an%x00%ad%x00%B", "--name-only", "-z"]
         if revision_range:
             cmd.append(revision_range)
-        result = self.run_command(cmd, log_title="Git: Get Commits", stack_up=1)
-
-        pattern = _re.compile(
-            rf"{_re.escape(marker_start)}\n(.*?)\n(.*?)\n(.*?)\n(.*?){_re.escape(marker_commit_end)}\n(.*?)(?:\n\n|$)",
-            _re.DOTALL,
+        code = None
+        # Stderr goes to a file, so that git cannot block on it while stdout is being read.
+        with _tempfile.TemporaryFile() as err_file:
+            try:
+                process = _subprocess.Popen(cmd, cwd=self._path, stdout=_subprocess.PIPE, stderr=err_file)
+            except FileNotFoundError:
+                pass
+            else:
+                with process:
+                    fields = []
+                    remainder = b""
+                    for chunk in iter(_partial(process.stdout.read1, 1 << 16), b""):
+                        *complete_fields, remainder = (remainder + chunk).split(b"\0")
+                        for field in complete_fields:
+                            if field or len(fields) < 4:
+                                if field or fields:
+                                    fields.append(field)
+                                continue
+                            yield make_commit(fields)
+                            fields = []
+                    if len(fields) >= 4:
+                        yield make_commit(fields)
+                code = process.returncode
+            err_file.seek(0)
+            err = err_file.read()
+        # The streamed output is not retained, so only the exit code and stderr are reported.
+        self._check_output(
+            _pyshellman.ShellOutput(
+                title="Git: Get Commits",
+                command=cmd,
+                cwd=self._path,
+                code=code,
+                err=err.decode(errors="replace").strip() or None,
+            ),
+            stack_up=1,
         )
-
-        matches = pattern.findall(result.out)
-
-        commits = []
-        for match in matches:
-            commit_info = {
-                "hash": match[0].strip(),
-                "author": match[1].strip(),
-                "date": match[2].strip(),
-                "msg": match[3].strip(),
-                "files": list(filter(None, match[4].strip().split("\n"))),
-            }
-            commits.append(commit_info)
-        return commits
+        return
 
     def current_branch_name(self) -> str:
         """Get the name of the current branch."""
-        return self.run_command(
-            ["branch", "--show-current"],
+        return self._cached_run(
+            list(_CURRENT_BRANCH_PROBE),
             log_title="Git: Show Current Branch",
-            stack_up=1,
+            stack_up=2,
         ).out
 
     def branch_delete(self, branch_name: str, force: bool = False) -> None:
@@ -652,20 +1111,20 @@ class Git:
 
     def get_all_branch_names(self) -> tuple[str, list[str]]:
         """Get the name of all branches."""
-        result = self.run_command(["branch"], log_title="Git: Get Branch Names", stack_up=1)
+        out = self.run_command(
+            ["for-each-ref", "--format=%(HEAD)%00%(refname:lstrip=2)", "refs/heads"],
+            log_title="Git: Get Branch Names",
+            stack_up=1,
+        ).out or ""
         branches_other = []
         branch_current = []
-        for branch in result.out.split("\n"):
-            branch = branch.strip()
-            if not branch:
-                continue
-            if branch.startswith("*"):
-                branch_current.append(branch.removeprefix("*").strip())
-            else:
-                branches_other.append(branch)
+        for line in out.splitlines():
+            # '%(HEAD)' is '*' for the current branch, and ' ' otherwise
+            head, branch = line.split("\0")
+            (branch_current if head == "*" else branches_other).append(branch)
         if len(branch_current) > 1:
             raise _exception.GitTidyOperationError("More than one current branch found.")
-        return branch_current[0], branches_other
+        return branch_current[0] if branch_current else "", branches_other
 
     def checkout(self, branch: str, create: bool = False, reset: bool = False, orphan: bool = False) -> None:
         """Checkout a branch."""
@@ -705,27 +1164,18 @@ class Git:
         This returns a list of tags ordered by the commit date (newest first).
         Each element is a list itself, containing all tags that point to the same commit.
         """
-        logs = self.log(simplify_by_decoration=True, pretty="format:%D")
-        tags_on_branch = (
-            self.run_command(
-                ["tag", "--merged"],
-                log_title="Git: Get Tags on Branch",
-                stack_up=1,
-            ).out or ""
-        ).splitlines()
-        tags = []
-        for line in logs.splitlines():
-            potential_tags = line.split(", ")
-            sub_list_added = False
-            for potential_tag in potential_tags:
-                if potential_tag.startswith("tag: "):
-                    tag = potential_tag.removeprefix("tag: ")
-                    if tag in tags_on_branch:
-                        if not sub_list_added:
-                            tags.append([])
-                            sub_list_added = True
-                        tags[-1].append(tag)
-        return tags
+        # Walking from HEAD only reaches tags merged into the current branch,
+        # and `--decorate-refs` restricts the decorations to tags.
+        logs = self.run_command(
+            ["log", "--simplify-by-decoration", "--decorate-refs=refs/tags/", "--pretty=format:%D"],
+            log_title="Git: Get Tags on Branch",
+            text_output=False,
+            stack_up=1,
+        ).out or b""
+        return [
+            [tag.removeprefix(b"tag: ").decode() for tag in line.split(b", ")]
+            for line in logs.split(b"\n") if line
+        ]
 
     def get_remotes(self) -> dict[str, dict[str, str]]:
         """
@@ -748,7 +1198,7 @@ class Git:
             }
         }
         """
-        out = self.run_command(["remote", "-v"], log_title="Git: Get Remotes", stack_up=1).out or ""
+        out = self._cached_run(["remote", "-v"], log_title="Git: Get Remotes", stack_up=2).out or ""
         remotes = {}
         for remote in out.splitlines():
             remote_name, url, purpose_raw = remote.split()
@@ -769,9 +1219,7 @@ class Git:
         fallback_purpose: bool = True,
     ) -> tuple[str, str] | None:
         def extract_repo_name_from_url(url):
-            # Regular expression pattern for extracting repo name from GitHub URL
-            pattern = _re.compile(r"github\.com[/:]([\w\-]+)/([\w\-.]+?)(?:\.git)?$")
-            match = pattern.search(url)
+            match = _GITHUB_URL_RE.search(url)
             if not match:
                 return
             owner, repo = match.groups()[0:2]
@@ -804,20 +1252,62 @@ class Git:
         return
 
     def check_gitattributes(self) -> bool:
-        command = ["sh", "-c", "git ls-files | git check-attr -a --stdin | grep 'text: auto'"]
-        result = _pyshellman.run(
-            command=command,
-            cwd=self._path,
+        """Check that no tracked file has the 'text' attribute set to 'auto'."""
+        # `git ls-files | git check-attr -a --stdin`, piped directly without a shell
+        commands = [["git", "ls-files"], ["git", "check-attr", "-a", "--stdin"]]
+        code = None
+        attributes = err = b""
+        try:
+            with _tempfile.TemporaryFile() as ls_files_err:
+                ls_files = _subprocess.Popen(
+                    commands[0], cwd=self._path, stdout=_subprocess.PIPE, stderr=ls_files_err
+                )
+                with ls_files:
+                    check_attr = _subprocess.Popen(
+                        commands[1],
+                        cwd=self._path,
+                        stdin=ls_files.stdout,
+                        stdout=_subprocess.PIPE,
+                        stderr=_subprocess.PIPE,
+                    )
+                    ls_files.stdout.close()
+                    attributes, err = check_attr.communicate()
+                ls_files_err.seek(0)
+                err = ls_files_err.read() + err
+                # Warnings on stderr are not failures; only non-zero exit codes are.
+                code = ls_files.returncode or check_attr.returncode
+        except FileNotFoundError:
+            pass
+        self._check_output(
+            _pyshellman.ShellOutput(
+                title="Git: Check Attributes",
+                command=[*commands[0], "|", *commands[1]],
+                cwd=self._path,
+                code=code,
+                err=err.decode(errors="replace").strip() or None,
+            ),
             raise_execution=True,
             raise_exit_code=True,
-            raise_stderr=True,
-            text_output=True,
+            log=False,
+            stack_up=1,
         )
-        return not result.out
+        return b"text: auto" not in attributes
 
     def file_at_hash(self, commit_hash: str, path: str | _Path, raise_missing: bool = True) -> str | None:
+        obj_name = f"{commit_hash}:{path}"
+        if "\n" not in obj_name:
+            obj = self._cat_file(obj_name)
+            if obj and obj[1] == "blob":
+                # Translate newlines as the text mode output of `git show` below does.
+                content = obj[2].decode().replace("\r\n", "\n").replace("\r", "\n")
+                return content.strip() or None
+            if not obj and not raise_missing:
+                return
+        # Paths containing newlines cannot be sent through the batch process,
+        # non-blob objects (e.g. directories) are rendered by `git show`,
+        # and missing objects are reported by it.
         result = self.run_command(
-            ["show", f"{commit_hash}:{path}"],
+            ["show", obj_name],
             log_title="Git: Get File at Commit",
             raise_exit_code=raise_missing,
             stack_up=1,
@@ -877,35 +1367,105 @@ class Git:
         )
         return
 
+    def _status(
+        self,
+        path: str | None = None,
+        untracked: bool = False,
+        ignore_dirty_submodules: bool = False,
+        log_title: str = "Git: Get Status",
+    ) -> bytes:
+        """Get the NUL-delimited porcelain status of the working tree.
+
+        Each entry is a single 'XY <path>' field, where X and Y are the staged and unstaged
+        statuses, respectively; renames are reported as a deletion and an addition.
+        Untracked files (with status '??') are only included if `untracked` is set.
+        """
+        cmd = ["status", "--porcelain", "-z", "--no-renames", f"--untracked-files={'normal' if untracked else 'no'}"]
+        if ignore_dirty_submodules:
+            cmd.append("--ignore-submodules=dirty")
+        if path:
+            cmd.extend(["--", str(path)])
+        return self.run_command(cmd, text_output=False, log_title=log_title, log=False, stack_up=2).out or b""
+
+    def _cat_file(self, obj: str, content: bool = True) -> tuple[str, str, bytes | None] | None:
+        """Look up an object via a persistent `git cat-file --batch` (or `--batch-check`) process.
+
+        Parameters
+        ----------
+        obj : str
+            Object name, e.g. 'HEAD~1' or '<commit>:<path>'.
+        content : bool, default: True
+            Whether to also read the object's content.
+            If False, only the hash and type are looked up.
+
+        Returns
+        -------
+        The object's hash, type, and raw content (None if `content` is False),
+        or None if the object does not exist.
+        """
+        mode = "--batch" if content else "--batch-check"
+        with self._cat_file_lock:
+            process = self._cat_file_processes.get(mode)
+            if not process or process.poll() is not None:
+                process = self._cat_file_processes[mode] = _subprocess.Popen(
+                    ["git", "-C", str(self._path), "cat-file", mode],
+                    stdin=_subprocess.PIPE,
+                    stdout=_subprocess.PIPE,
+                    stderr=_subprocess.DEVNULL,
+                )
+            process.stdin.write(f"{obj}\n".encode())
+            process.stdin.flush()
+            header = process.stdout.readline().split()
+            if len(header) != 3:
+                # '<obj> missing' or '<obj> ambiguous'
+                return
+            obj_hash, obj_type, size = (part.decode() for part in header)
+            if not content:
+                return obj_hash, obj_type, None
+            # Content is followed by a newline
+            data = process.stdout.read(int(size) + 1)[:-1]
+        return obj_hash, obj_type, data
+
     @_contextmanager
     def _temporary_credentials(self):
+        temporary = []
+        original = []
         if not self._author_persistent:
-            self.set_user(
+            temporary += _user_config_entries(
                 username=self._author_username,
                 email=self._author_email,
                 user_type="author",
-                scope=self._author_scope
+                scope=self._author_scope,
+            )
+            original += _user_config_entries(
+                username=self._original_author_username,
+                email=self._original_author_email,
+                user_type="author",
+                scope=self._author_scope,
             )
         if not self._committer_persistent:
-            self.set_user(
+            temporary += _user_config_entries(
                 username=self._committer_username,
                 email=self._committer_email,
                 user_type="committer",
                 scope=self._committer_scope,
             )
-        yield
-        if not self._author_persistent:
-            self.set_user(
-                username=self._original_author_username,
-                email=self._original_author_email,
-                user_type="author",
-                scope=self._author_scope
-            )
-        if not self._committer_persistent:
-            self.set_user(
+            original += _user_config_entries(
                 username=self._original_committer_username,
                 email=self._original_committer_email,
                 user_type="committer",
                 scope=self._committer_scope,
             )
+        self._set_config(temporary, log_title="Git: Set Temporary Credentials")
+        yield
+        # Only restore entries that were actually changed above.
+        temporary_values = {(scope, key): value for scope, key, value in temporary}
+        self._set_config(
+            [
+                (scope, key, value) for scope, key, value in original
+                if (scope, key) in temporary_values and temporary_values[(scope, key)] != value
+            ],
+            log_title="Git: Restore Credentials",
+            skip_unchanged=False,
+        )
         return